@@ -5950,7 +5950,23 @@ class MultiThreshold(OnnxOpConverter):
     @classmethod
     def _impl_v1(cls, inputs, attr, params):
         assert len(inputs) == 2, "MultiThreshold op take 2 inputs, {} given".format(len(inputs))
-        return _op.nn.multi_threshold(inputs[0], inputs[1], attr.get("out_dtype"), attr.get("out_bias"))
+        thresholds = inputs[1]
+        if isinstance(thresholds, _expr.Var) and thresholds.name_hint in params:
+            # initializers arrive as vars bound in params, out of reach of the check in the op
+            thresholds_np = params[thresholds.name_hint].numpy()
+            assert (
+                thresholds_np[..., 1:] >= thresholds_np[..., :-1]
+            ).all(), "MultiThreshold thresholds must be sorted along the last axis"
+        out = _op.nn.multi_threshold(
+            inputs[0], inputs[1], attr.get("out_dtype"), attr.get("out_bias")
+        )
+        # FINN graphs hold the integer result in a float tensor, which the scale and bias nodes
+        # following a MultiThreshold expect. That is the type of a float input; the count could
+        # wrap in the type of an integer input, so those results go to float32 instead.
+        dtype = infer_type(inputs[0]).checked_type.dtype
+        if "float" not in dtype:
+            dtype = "float32"
+        return _op.cast(out, dtype)
 
 
 # compatible operators that do NOT require any conversion.
@@ -258,11 +258,14 @@ def broadcast_shape_func(attrs, inputs, out_ndims):
     return [_broadcast_shape_func(*inputs, out_ndims[0])]
 
 
+_identity = topi.math.identity
+
+
 def elemwise_shape_func(attrs, inputs, _):
     """
     Shape function for elemwise op.
     """
-    return [topi.math.identity(inputs[0])]
+    return (_identity(inputs[0]),)
 
 
 register_shape_func("cast", False, elemwise_shape_func)
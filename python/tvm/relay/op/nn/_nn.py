@@ -668,16 +668,7 @@ def compute_lrn(attrs, inputs, out_dtype):
 reg.register_schedule("nn.lrn", strategy.schedule_lrn)
 
 # multi_threshold
-@reg.register_compute("nn.multi_threshold")
-def compute_multi_threshold(attrs, inputs, out_dtype):
-    """Compute definition of multithreshold"""
-    assert len(inputs) == 2
-    signed = 'UINT' not in attrs.out_dtype
-    bit_width = int(''.join([c for c in attrs.out_dtype if c.isdigit()]))
-    out_bias = int(attrs.out_bias)
-    return [topi.nn.multi_threshold(inputs[0], inputs[1],bit_width, signed, out_bias)]
-
-reg.register_broadcast_schedule("nn.multi_threshold")
+reg.register_strategy("nn.multi_threshold", strategy.multi_threshold_strategy)
 
 
 # upsampling
@@ -1717,9 +1717,10 @@ def multi_threshold(
         The input data to the operator.
 
     thresholds: relay.Expr
-        The thresholds values.
+        The thresholds values, sorted in ascending order along the last axis. This is only
+        checked for a constant; the result for unsorted thresholds is undefined.
 
-    out_dtype: str
+    out_dtype: str or bytes
         Type to return.
 
     out_bias : float
@@ -1731,7 +1732,15 @@ def multi_threshold(
         The integer result of the new domain.
     """
 
-    out_dtype = out_dtype.decode('utf-8')
+    if isinstance(thresholds, Constant):
+        thresholds_np = thresholds.data.numpy()
+        assert (
+            thresholds_np[..., 1:] >= thresholds_np[..., :-1]
+        ).all(), "MultiThreshold thresholds must be sorted along the last axis"
+
+    if isinstance(out_dtype, bytes):
+        # string attributes of ONNX nodes arrive as bytes
+        out_dtype = out_dtype.decode("utf-8")
     return _make.multi_threshold(data, thresholds, out_dtype, out_bias)
 
 
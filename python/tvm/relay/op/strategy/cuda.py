@@ -132,6 +132,18 @@ def schedule_lrn_cuda(attrs, outs, target):
         return topi.cuda.schedule_lrn(outs)
 
 
+@multi_threshold_strategy.register(["cuda", "gpu"])
+def multi_threshold_strategy_cuda(attrs, inputs, out_type, target):
+    """multi_threshold cuda strategy"""
+    strategy = _op.OpStrategy()
+    strategy.add_implementation(
+        wrap_compute_multi_threshold(topi.nn.multi_threshold),
+        wrap_topi_schedule(topi.cuda.schedule_multi_threshold),
+        name="multi_threshold.cuda",
+    )
+    return strategy
+
+
 @conv2d_strategy.register(["cuda", "gpu"])
 def conv2d_strategy_cuda(attrs, inputs, out_type, target):
     """conv2d cuda strategy"""
@@ -205,6 +205,33 @@ def schedule_lrn(attrs, outs, target):
         return topi.generic.schedule_lrn(outs)
 
 
+# multi_threshold
+def wrap_compute_multi_threshold(topi_compute):
+    """Wrap multi_threshold topi compute"""
+
+    def _compute_multi_threshold(attrs, inputs, out_type):
+        signed = "UINT" not in attrs.out_dtype
+        bit_width = int("".join([c for c in attrs.out_dtype if c.isdigit()]))
+        out_bias = int(attrs.out_bias)
+        return [
+            topi_compute(inputs[0], inputs[1], bit_width, signed, out_bias, out_type.dtype)
+        ]
+
+    return _compute_multi_threshold
+
+
+@override_native_generic_func("multi_threshold_strategy")
+def multi_threshold_strategy(attrs, inputs, out_type, target):
+    """multi_threshold generic strategy"""
+    strategy = _op.OpStrategy()
+    strategy.add_implementation(
+        wrap_compute_multi_threshold(topi.nn.multi_threshold),
+        schedule_injective,
+        name="multi_threshold.generic",
+    )
+    return strategy
+
+
 # pad
 @generic_func
 def schedule_pad(attrs, outs, target):
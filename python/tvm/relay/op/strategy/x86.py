@@ -25,7 +25,7 @@ from tvm.meta_schedule import is_meta_schedule_enabled
 from tvm.relay.ty import is_dynamic
 from tvm.target import Target
 from tvm.te import SpecializedCondition
-from tvm.topi.x86.utils import target_has_vnni
+from tvm.topi.x86.utils import target_has_avx2, target_has_vnni
 
 from .. import op as _op
 from .generic import *
@@ -614,6 +614,33 @@ def dense_pack_strategy_cpu(attrs, inputs, out_type, target):
     return strategy
 
 
+@multi_threshold_strategy.register("cpu")
+def multi_threshold_strategy_cpu(attrs, inputs, out_type, target):
+    """multi_threshold x86 strategy"""
+    strategy = _op.OpStrategy()
+    data, thresholds = inputs
+    if (
+        data.dtype == "int8"
+        and thresholds.dtype == "int8"
+        and get_const_int(thresholds.shape[1]) < 256
+        and target_has_avx2(Target.current().mcpu)
+    ):
+        strategy.add_implementation(
+            wrap_compute_multi_threshold(topi.x86.multi_threshold_int8),
+            wrap_topi_schedule(topi.x86.schedule_multi_threshold_int8),
+            name="multi_threshold_int8.x86",
+            plevel=15,
+        )
+    else:
+        strategy.add_implementation(
+            wrap_compute_multi_threshold(topi.nn.multi_threshold),
+            wrap_topi_schedule(topi.x86.schedule_injective),
+            name="multi_threshold.x86",
+            plevel=10,
+        )
+    return strategy
+
+
 @batch_matmul_strategy.register("cpu")
 def batch_matmul_strategy_cpu(attrs, inputs, out_type, target):
     """batch_matmul x86 strategy"""
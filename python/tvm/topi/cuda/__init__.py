@@ -61,3 +61,4 @@ from .transform import *
 from .unique import *
 from .searchsorted import *
 from .stft import *
+from .multi_threshold import *
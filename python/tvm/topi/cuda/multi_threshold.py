@@ -0,0 +1,82 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+# pylint: disable=invalid-name
+"""Schedule for the MultiThreshold operator on CUDA"""
+from tvm import te
+from ...target import Target
+from ..utils import get_const_tuple, traverse_inline
+from .injective import schedule_injective
+
+
+def schedule_multi_threshold(outs):
+    """Schedule for multi_threshold.
+
+    Every block handles one channel and stages the thresholds of that channel into shared
+    memory once, so the spatial positions of the block reuse them instead of reading each
+    threshold from global memory per element. Injective ops fused with multi_threshold, such
+    as the cast after it, are inlined into the same threads.
+
+    Parameters
+    ----------
+    outs: Array of Tensor
+        The computation graph description of multi_threshold
+        in the format of an array of tensors.
+
+    Returns
+    -------
+    s: Schedule
+        The computation schedule for multi_threshold.
+    """
+    outs = [outs] if isinstance(outs, te.tensor.Tensor) else outs
+    out = outs[0]
+    s = te.create_schedule([x.op for x in outs])
+    multi_thresholds = []
+
+    def _callback(op):
+        if op.tag.endswith("multi_threshold"):
+            multi_thresholds.append(op)
+
+    traverse_inline(s, out.op, _callback)
+    if (
+        len(outs) > 1
+        or len(multi_thresholds) != 1
+        or len(out.shape) < 2
+        or get_const_tuple(out.shape) != get_const_tuple(multi_thresholds[0].output(0).shape)
+    ):
+        # the fused group does not map element-wise onto multi_threshold, fall back to the
+        # injective schedule
+        return schedule_injective(outs)
+
+    num_thread = Target.current(allow_none=False).max_num_threads
+
+    # the data is always read before the thresholds in the body of multi_threshold
+    _, thresholds = multi_thresholds[0].input_tensors
+    thresholds_shared = s.cache_read(thresholds, "shared", [multi_thresholds[0]])
+
+    n, c, *spatial = s[out].op.axis
+    s[out].reorder(c, n, *spatial)
+    bx, tx = s[out].split(s[out].fuse(n, *spatial), factor=num_thread)
+    s[out].bind(c, te.thread_axis("blockIdx.y"))
+    s[out].bind(bx, te.thread_axis("blockIdx.x"))
+    s[out].bind(tx, te.thread_axis("threadIdx.x"))
+
+    s[thresholds_shared].compute_at(s[out], bx)
+    _, load_tx = s[thresholds_shared].split(
+        s[thresholds_shared].fuse(*s[thresholds_shared].op.axis), factor=num_thread
+    )
+    s[thresholds_shared].bind(load_tx, te.thread_axis("threadIdx.x"))
+    return s
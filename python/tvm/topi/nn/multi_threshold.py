@@ -15,56 +15,111 @@
 # specific language governing permissions and limitations
 # under the License.
 """MultiThreshold operator"""
-import typing
-
+import tvm
 from tvm import te
-from tvm import topi
+from .. import tag
+from ..utils import get_const_int
 
 
-def get_transpose_dims(data):
-    dims = list(range(len(data.shape)))
-    dims[0] = 1
-    dims[1] = 0
-    return dims
+def multi_threshold(
+    data: te.Tensor,
+    thresholds: te.Tensor,
+    bit_width: int,
+    signed: bool,
+    out_bias: int,
+    out_dtype: str = "int32",
+) -> te.Tensor:
+    """FINN MultiThreshold operator (see arXiv:1709.04060).
 
+    This operator takes data as input from a given domain (floating point or integer) and maps
+    it to another domain (necessarily integer). That is, for a value x in the input, the output
+    integer corresponds to the number of thresholds that x is greater or equal to.
 
-def reshape_data_for_broadcast(data, thresholds):
-    assert data.shape[1] == thresholds.shape[0], "shapes not compatible for broadcast"
+    The thresholds of each channel must be sorted in ascending order, which holds for FINN
+    threshold tables by construction. The count is then the insertion index of x in its
+    thresholds, found with a branchless binary search of ceil(log2(num_thresholds + 1))
+    comparisons per element, computed directly in the layout of the input. Tables of at most
+    64 thresholds are counted with :py:func:`multi_threshold_popcount` instead.
 
-    single_elem_in_batch = data.shape[0].value == 1
-    if single_elem_in_batch:
-        data = topi.squeeze(data, 0)
-    else :
-        data = topi.transpose(data, get_transpose_dims(data))
+    Parameters
+    ----------
+    data : tvm.te.Tensor
+        Input to the multi-threshold operator, with the channels on axis 1.
 
-    data = topi.expand_dims(data, -1)
-    data = topi.repeat(data, thresholds.shape[1].value, -1)
-    return data, single_elem_in_batch
+    thresholds : tvm.te.Tensor
+        The threshold values, 2-D with shape [channel, num_thresholds], sorted along the last axis.
 
+    bit_width: int
+        The bit-width of the integer domain.
 
-def restore_result_shape(res, single_elem_in_batch):
-    if single_elem_in_batch:
-        res = topi.expand_dims(res, -1)
-    return topi.transpose(res, get_transpose_dims(res))
+    signed : bool
+        Whether the integer domain is signed or not.
 
-def multi_threshold(
+    out_bias : float
+        The biass added to the output
+
+    out_dtype : str
+        The integer dtype holding the output domain, e.g. uint8 for bit-widths up to 8.
+
+    Returns
+    -------
+    output : tvm.te.Tensor
+        The computed result of same shape as of the input but now in the target integer domain.
+    """
+    assert thresholds.shape[-1].value < 2**bit_width
+    assert not signed or out_bias < 0
+    assert data.shape[1] == thresholds.shape[0], "shapes not compatible for broadcast"
+
+    num_thresholds = get_const_int(thresholds.shape[1])
+    if num_thresholds <= 64:
+        return multi_threshold_popcount(data, thresholds, bit_width, signed, out_bias, out_dtype)
+
+    def _search(value, channel, count, step):
+        # Each step takes a power-of-two stride when the threshold it lands on is reached. The
+        # candidate is clamped to the table size so that overshooting strides compare against the
+        # last threshold, which leaves count unchanged unless value reaches every threshold.
+        if step == 0:
+            return count
+        candidate = te.min(count + step, num_thresholds)
+        next_count = tvm.tir.Var("count", "int32")
+        return tvm.tir.Let(
+            next_count,
+            tvm.tir.Select(value >= thresholds[channel, candidate - 1], candidate, count),
+            _search(value, channel, next_count, step >> 1),
+        )
+
+    def _compute(*indices):
+        first_step = 1 << (num_thresholds.bit_length() - 1)
+        count = _search(data(*indices), indices[1], tvm.tir.const(0, "int32"), first_step)
+        return (count + out_bias).astype(out_dtype)
+
+    return te.compute(
+        data.shape, _compute, name="multi_threshold", tag=tag.INJECTIVE + ",multi_threshold"
+    )
+
+
+def multi_threshold_popcount(
     data: te.Tensor,
     thresholds: te.Tensor,
     bit_width: int,
     signed: bool,
-    out_bias: int
-) -> typing.List[te.Tensor]:
-    """Batch normalization layer (Ioffe and Szegedy, 2014).
+    out_bias: int,
+    out_dtype: str = "int32",
+) -> te.Tensor:
+    """FINN MultiThreshold operator for tables of at most 64 thresholds.
 
-    This operator takes data as input from a given domain (floating point or integer) and maps it to another domain (necessarily integer). That is, for a value x in the input, the output integer corresponds to the number of thresholds that x is greater or equal to.
+    The comparisons of x against the thresholds of its channel are packed into the bits of a
+    uint64 and the reached thresholds are counted with a single popcount, which lowers to
+    llvm.ctpop (POPCNT / CNT) on CPUs and __popcll on CUDA. The comparisons do not depend on
+    each other, so the thresholds need not be sorted.
 
     Parameters
     ----------
     data : tvm.te.Tensor
-        Input to the multi-threshold operator.
+        Input to the multi-threshold operator, with the channels on axis 1.
 
     thresholds : tvm.te.Tensor
-        The threshold values.
+        The threshold values, 2-D with shape [channel, num_thresholds] and num_thresholds <= 64.
 
     bit_width: int
         The bit-width of the integer domain.
@@ -75,6 +130,9 @@ def multi_threshold(
     out_bias : float
         The biass added to the output
 
+    out_dtype : str
+        The integer dtype holding the output domain, e.g. uint8 for bit-widths up to 8.
+
     Returns
     -------
     output : tvm.te.Tensor
@@ -82,11 +140,20 @@ def multi_threshold(
     """
     assert thresholds.shape[-1].value < 2**bit_width
     assert not signed or out_bias < 0
+    assert data.shape[1] == thresholds.shape[0], "shapes not compatible for broadcast"
 
-    data_reshaped, single_elem_in_batch = reshape_data_for_broadcast(data, thresholds)
-    compare = topi.greater_equal(data_reshaped, thresholds).astype('float32')
-    compare_sum = topi.sum(compare, -1)
-
-    # restore correct shape
-    res = restore_result_shape(compare_sum, single_elem_in_batch).astype('float32')
-    return res
+    num_thresholds = get_const_int(thresholds.shape[1])
+    assert num_thresholds <= 64, "at most 64 thresholds fit in the uint64 mask"
+
+    def _compute(*indices):
+        value = data(*indices)
+        channel = indices[1]
+        mask = tvm.tir.const(0, "uint64")
+        for k in range(num_thresholds):
+            hit = (value >= thresholds[channel, k]).astype("uint64")
+            mask = mask | (hit << tvm.tir.const(k, "uint64"))
+        return (tvm.tir.popcount(mask).astype("int32") + out_bias).astype(out_dtype)
+
+    return te.compute(
+        data.shape, _compute, name="multi_threshold", tag=tag.INJECTIVE + ",multi_threshold"
+    )
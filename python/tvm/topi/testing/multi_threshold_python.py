@@ -0,0 +1,83 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+# pylint: disable=invalid-name
+"""MultiThreshold in python"""
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+    prange = range
+
+
+def _count_thresholds(data, thresholds, out):
+    # data and out are [batch, channel, spatial], thresholds is [channel, num_thresholds]
+    for n in prange(data.shape[0]):  # pylint: disable=not-an-iterable
+        for c in range(data.shape[1]):
+            for i in range(data.shape[2]):
+                value = data[n, c, i]
+                count = 0
+                for k in range(thresholds.shape[1]):
+                    count += value >= thresholds[c, k]
+                out[n, c, i] = count
+
+
+if njit is not None:
+    _count_thresholds = njit(parallel=True, nogil=True)(_count_thresholds)
+
+
+def multi_threshold_python(data_np, thresholds_np, out_bias=0, out_dtype="int32"):
+    """Reference implementation of the FINN MultiThreshold operator.
+
+    Parameters
+    ----------
+    data_np : numpy.ndarray
+        N-D with the channels on axis 1
+
+    thresholds_np : numpy.ndarray
+        2-D with shape [channel, num_thresholds]
+
+    out_bias : int
+        The bias added to the output
+
+    out_dtype : str
+        The dtype of the output
+
+    Returns
+    -------
+    out_np : numpy.ndarray
+        The number of thresholds each input value is greater or equal to plus
+        out_bias, with the same shape as data_np
+    """
+    if njit is not None:
+        # a single pass without the [..., num_thresholds] temporary when numba is available
+        data_3d = np.ascontiguousarray(data_np).reshape(data_np.shape[:2] + (-1,))
+        count = np.empty(data_3d.shape, dtype="int32")
+        _count_thresholds(data_3d, np.ascontiguousarray(thresholds_np), count)
+        count = count.reshape(data_np.shape)
+    else:
+        broadcast_shape = (1, thresholds_np.shape[0]) + (1,) * (data_np.ndim - 2)
+        thresholds_np = thresholds_np.reshape(broadcast_shape + (thresholds_np.shape[1],))
+        hits = data_np[..., np.newaxis] >= thresholds_np
+        if hasattr(np, "bitwise_count"):
+            # numpy >= 2.0: popcount the hit-mask packed 8 thresholds per byte
+            packed = np.packbits(hits, axis=-1)
+            count = np.sum(np.bitwise_count(packed), axis=-1, dtype="int32")
+        else:
+            count = np.sum(hits, axis=-1)
+    return (count + out_bias).astype(out_dtype)
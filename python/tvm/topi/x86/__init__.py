@@ -44,3 +44,4 @@ from .scatter import *
 from .group_conv2d import *
 from .math_alter_op import *
 from .concat import *
+from .multi_threshold import *
@@ -0,0 +1,171 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+# pylint: disable=invalid-name
+"""MultiThreshold operator for x86"""
+import numpy as np
+import tvm
+from tvm import te
+
+from .. import tag
+from ..utils import get_const_int, get_const_tuple, traverse_inline
+from .injective import schedule_injective_from_existing
+from .utils import target_has_avx512
+
+
+def multi_threshold_int8(data, thresholds, bit_width, signed, out_bias, out_dtype="int32"):
+    """MultiThreshold for int8 data and thresholds.
+
+    Counts the reached thresholds with a linear sweep over the thresholds axis into a uint8
+    accumulator, so tables are limited to 255 thresholds. Once the spatial axis is vectorized
+    this lowers to one packed 8-bit compare and one packed subtraction per threshold (vpcmpgtb
+    and vpsubb on AVX2). The bias is added in int16 and the result narrowed to out_dtype, so
+    an 8-bit output domain never leaves the 8-bit lanes apart from that final step.
+
+    Parameters
+    ----------
+    data : tvm.te.Tensor
+        int8 input to the multi-threshold operator, with the channels on axis 1.
+
+    thresholds : tvm.te.Tensor
+        int8 threshold values, 2-D with shape [channel, num_thresholds] and
+        num_thresholds < 256.
+
+    bit_width: int
+        The bit-width of the integer domain.
+
+    signed : bool
+        Whether the integer domain is signed or not.
+
+    out_bias : float
+        The biass added to the output
+
+    out_dtype : str
+        The integer dtype holding the output domain, e.g. uint8 for bit-widths up to 8.
+
+    Returns
+    -------
+    output : tvm.te.Tensor
+        The computed result of same shape as of the input but now in the target integer domain.
+    """
+    assert thresholds.shape[-1].value < 2**bit_width
+    assert not signed or out_bias < 0
+    assert data.shape[1] == thresholds.shape[0], "shapes not compatible for broadcast"
+    assert data.dtype == "int8" and thresholds.dtype == "int8"
+    assert get_const_int(thresholds.shape[1]) < 256, "the uint8 count holds at most 255"
+
+    k = te.reduce_axis((0, thresholds.shape[1]), name="k")
+    count = te.compute(
+        data.shape,
+        lambda *i: te.sum((data(*i) >= thresholds[i[1], k]).astype("uint8"), axis=k),
+        name="multi_threshold_count",
+        tag="multi_threshold_int8",
+    )
+    return te.compute(
+        data.shape,
+        lambda *i: (count(*i).astype("int16") + out_bias).astype(out_dtype),
+        name="multi_threshold",
+        tag=tag.ELEMWISE,
+    )
+
+
+def _vector_length(extent, row, lanes):
+    """Returns the number of elements of the vectorized axis computed at once.
+
+    Prefers a divisor of extent of up to four registers that covers whole rows or part of a
+    row, so that no stage of the schedule carries a tail predicate, which would scalarize it.
+    """
+    candidates = [
+        f
+        for f in range(lanes // 2, min(extent, 4 * lanes) + 1)
+        if extent % f == 0 and (f % row == 0 or row % f == 0)
+    ]
+    return max(candidates) if candidates else min(extent, lanes)
+
+
+def _split_vector(stage, factor):
+    """Splits the spatial axes of stage, fused, or its channel axis if it has none."""
+    axes = list(stage.op.axis)
+    if len(axes) > 2:
+        outer, inner = axes[:2], stage.fuse(*axes[2:])
+    else:
+        outer, inner = axes[:1], axes[1]
+    inner_o, inner_i = stage.split(inner, factor=factor)
+    return outer, inner_o, inner_i
+
+
+def schedule_multi_threshold_int8(outs):
+    """Schedule for multi_threshold_int8.
+
+    The spatial axes are fused and vectorized, as FINN feature maps are often narrower than a
+    register.
+
+    Parameters
+    ----------
+    outs: Array of Tensor
+        The computation graph description of multi_threshold_int8
+        in the format of an array of tensors.
+
+    Returns
+    -------
+    s: Schedule
+        The computation schedule for multi_threshold_int8.
+    """
+    outs = [outs] if isinstance(outs, te.tensor.Tensor) else outs
+    s = te.create_schedule([x.op for x in outs])
+    lanes = 64 if target_has_avx512(tvm.target.Target.current().mcpu) else 32
+    out = outs[0]
+
+    def _callback(op):
+        if op.tag == "multi_threshold_int8":
+            count = op.output(0)
+            (k,) = s[count].op.reduce_axis
+            shape = get_const_tuple(count.shape)
+            if len(shape) > 2:
+                factor = _vector_length(int(np.prod(shape[2:])), shape[-1], lanes)
+            else:
+                factor = _vector_length(shape[1], 1, lanes)
+
+            if get_const_tuple(out.shape) != shape:
+                # the fused output is shaped unlike the counts, keep the counts as their own stage
+                outer, inner_o, inner_i = _split_vector(s[count], factor)
+                s[count].reorder(*outer, inner_o, k, inner_i)
+                s[count].vectorize(inner_i)
+                s[count].parallel(s[count].fuse(*outer, inner_o))
+                schedule_injective_from_existing(s, out)
+                return
+
+            # Produce one vector of counts right where the output consumes it, rather than
+            # writing all counts to memory and reading them back in a second pass.
+            outer, inner_o, inner_i = _split_vector(s[out], factor)
+            s[out].vectorize(inner_i)
+            fused = s[out].fuse(*outer, inner_o)
+            s[out].parallel(fused)
+            s[count].compute_at(s[out], fused)
+            # Keep the thresholds axis outside of the vectorized spatial axis so that every
+            # threshold is compared against a full vector of data at once.
+            count_axes = list(s[count].op.axis)
+            if len(count_axes) > 2:
+                count_inner = s[count].fuse(*count_axes[2:])
+            else:
+                count_inner = count_axes[1]
+            s[count].reorder(k, count_inner)
+            s[count].vectorize(count_inner)
+
+    traverse_inline(s, out.op, _callback)
+    for x in outs[1:]:
+        schedule_injective_from_existing(s, x)
+    return s
@@ -110,7 +110,13 @@ bool MultiThresholdRel(const Array<Type>& types, int num_inputs, const Attrs& at
         return false;
     }
 
-    reporter->Assign(types[2], types[0]);
+    // The output is held by the narrowest integer container of the target domain.
+    int container_bits = 8;
+    while (container_bits < bit_width) container_bits *= 2;
+    DataType out_type =
+        out_dtype_signed ? DataType::Int(container_bits) : DataType::UInt(container_bits);
+
+    reporter->Assign(types[2], TensorType(data->shape, out_type));
     return true;
 }
 
@@ -7348,5 +7348,57 @@ def test_sequence(target, dev):
     verify_sequence_ops((3, 3, 3, 3), 4, axis=2, new_axis=1)
 
 
+@tvm.testing.parametrize_targets
+def test_multi_threshold(target, dev):
+    """test_multi_threshold"""
+
+    def verify_multi_threshold(data_shape, num_thresholds, out_dtype, out_bias, dtype):
+        channels = data_shape[1]
+        if dtype == "int8":
+            data = np.random.randint(-128, 128, size=data_shape).astype(dtype)
+            thresholds = np.random.randint(-128, 128, size=(channels, num_thresholds))
+        else:
+            data = np.random.uniform(-1, 1, size=data_shape).astype(dtype)
+            thresholds = np.random.uniform(-1, 1, size=(channels, num_thresholds))
+        thresholds = np.sort(thresholds.astype(dtype), axis=-1)
+
+        node = helper.make_node(
+            "MultiThreshold",
+            ["data", "thresholds"],
+            ["out"],
+            out_dtype=out_dtype,
+            out_bias=float(out_bias),
+            domain="finn.custom_op.general",
+        )
+        graph = helper.make_graph(
+            [node],
+            "MultiThreshold_test",
+            inputs=[
+                helper.make_tensor_value_info(
+                    "data", mapping.NP_TYPE_TO_TENSOR_TYPE[np.dtype(dtype)], list(data_shape)
+                ),
+            ],
+            initializer=[numpy_helper.from_array(thresholds, "thresholds")],
+            outputs=[helper.make_tensor_value_info("out", TensorProto.FLOAT, list(data_shape))],
+        )
+        model = helper.make_model(
+            graph,
+            producer_name="MultiThreshold_test",
+            opset_imports=[
+                onnx.helper.make_opsetid("", 11),
+                onnx.helper.make_opsetid("finn.custom_op.general", 1),
+            ],
+        )
+        tvm_out = get_tvm_output_with_vm(model, [data], target, dev)
+        ref = tvm.topi.testing.multi_threshold_python(data, thresholds, out_bias, "float32")
+        assert tvm_out.dtype == "float32"
+        np.testing.assert_equal(tvm_out, ref)
+
+    verify_multi_threshold((1, 4, 6, 6), 15, "UINT4", 0, "float32")
+    verify_multi_threshold((1, 4, 6, 6), 15, "INT4", -8, "float32")
+    # int8 data with counts above 127, which must not wrap on the way back to a float tensor
+    verify_multi_threshold((1, 4, 6, 6), 255, "UINT8", 0, "int8")
+
+
 if __name__ == "__main__":
     tvm.testing.main()
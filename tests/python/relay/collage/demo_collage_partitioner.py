@@ -22,12 +22,19 @@
 # models. See https://github.com/mbs-octoml/mbs-tvm/tree/mbs-collage-hacks.
 
 import tvm
+import concurrent.futures
+import functools
+import glob
+import itertools
 import logging
+import multiprocessing
 import tempfile
 import os
 import shutil
+import subprocess
 
 import menangerie
+from tvm_collage_runner import run, write_params
 
 # The following are necessary to force global functions or pattern tables to be registered
 from tvm.relay.op.contrib.cutlass import partition_for_cutlass
@@ -76,53 +83,17 @@ MEASURE_NUMBER = tvm.relay.collage.MEASURE_NUMBER
 MEASURE_REPEAT = tvm.relay.collage.MEASURE_REPEAT
 WARMUP_MIN_REPEAT_MS = tvm.relay.collage.WARMUP_MIN_REPEAT_MS
 
+###
+### Number of independent AutoTVM tasks to tune concurrently. Each concurrent task measures on
+### the same device, and concurrent kernels distort each other's timings, so only raise this
+### when measurements go to separate devices. The CPUs are shared out among the tasks' builders.
+### With 1, tasks are tuned in-process and each learns from the trials of those tuned before it.
+###
+AUTOTVM_CONCURRENT_TASKS = 1
+
 HOST = tvm.target.Target("llvm")
 CUDA = tvm.target.Target("cuda", HOST)
 
-########### Runtime ###########
-
-# Code to run a model. The actual call to 'run' is appended at compile time.
-# We invoke the model as a sub-process so that we can wrap profiling tools around it.
-runner_template = f"""
-import tvm
-import tvm.runtime.vm
-import numpy as np
-import logging
-
-logging.basicConfig(level=logging.INFO)
-
-MEASURE_NUMBER = {MEASURE_NUMBER}
-MEASURE_REPEAT = {MEASURE_REPEAT}
-WARMUP_MIN_REPEAT_MS = {WARMUP_MIN_REPEAT_MS}
-
-def arg_for(shape, dtype, device):
-    return tvm.nd.array(
-        np.random.rand(*shape).astype(dtype), device=device)
-
-def vm_estimate_seconds(device, vm, args):
-    vm.benchmark(device, repeat=1, number=1, min_repeat_ms=WARMUP_MIN_REPEAT_MS, **args)
-    return vm.benchmark(device, repeat=MEASURE_REPEAT, number=MEASURE_NUMBER, min_repeat_ms=0,
-                        **args)
-
-
-def run(label, name, device, lib_path, code_path, input_shapes, input_dtypes):
-    logging.info(f"Loading compiled code for {{name}} generated by {{label}} from {{lib_path}} and {{code_path}}...")
-    loaded_lib = tvm.runtime.load_module(lib_path)
-    loaded_code = bytearray(open(code_path, "rb").read())
-    loaded_exe = tvm.runtime.vm.Executable.load_exec(loaded_code, loaded_lib)
-    vm = tvm.runtime.vm.VirtualMachine(loaded_exe, device)
-    args = {{
-        input_name: arg_for(input_shapes[input_name], input_dtypes[input_name], device)
-        for input_name in input_shapes.keys()
-    }}
-    logging.info(f"Benchmarking for {{name}} generated by {{label}}...")
-    profile = vm_estimate_seconds(device, vm, args)
-    logging.info(f"Benchmarked for {{name}} generated by {{label}}: {{profile}}")
-    logging.info(f"RESULT: {{label}} | {{name}} | {{profile.median * 1e3}}ms")
-
-if __name__ == "__main__":
-"""
-
 ########### AutoTVM tuning helpers ###########
 
 
@@ -131,12 +102,23 @@ def extract_autotvm_tasks(mod, target):
     return tvm.autotvm.task.extract_from_program(mod, target=target, params=None)
 
 
+@functools.lru_cache(maxsize=4)
+def _load_best(log_filename, mtime):
+    """Returns the best records in log_filename as last modified at mtime."""
+    return tvm.autotvm.task.ApplyHistoryBest(log_filename)
+
+
+def load_best(log_filename):
+    """Returns the best records in log_filename, only re-parsing it once it has changed."""
+    return _load_best(log_filename, os.stat(log_filename).st_mtime_ns)
+
+
 def optional_tuning_records(log_filename):
     """Returns existing tuning records, if any."""
     if log_filename == "" or not os.path.exists(log_filename):
         return tvm.autotvm.task.FallbackContext()
     else:
-        return tvm.autotvm.task.ApplyHistoryBest(log_filename)
+        return load_best(log_filename)
 
 
 def is_already_tuned(task, log_filename):
@@ -144,74 +126,147 @@ def is_already_tuned(task, log_filename):
     if not os.path.exists(log_filename):
         return False
 
-    dispatch_context = tvm.autotvm.task.ApplyHistoryBest(log_filename)
-    return dispatch_context.contains(task.target, task.workload)
-
+    dispatch_context = load_best(log_filename)
+    if (task.target.model, task.workload) in dispatch_context.best_by_model:
+        return True
+    return any(
+        (key, task.workload) in dispatch_context.best_by_targetkey for key in task.target.keys
+    )
 
-def tune_autotvm_tasks(tasks, log_filename):
-    """Appends to log_filename the best strategies for tasks"""
-    if len(tasks) == 0:
-        return
 
+def _tune_one(task, prefix, seed_log_filenames, task_log_filename, n_parallel):
+    """Tunes task, warm-started from seed_log_filenames, logging its trials to task_log_filename"""
     measure_option = tvm.autotvm.measure_option(
-        builder=tvm.autotvm.LocalBuilder(timeout=TIMEOUT),
+        builder=tvm.autotvm.LocalBuilder(timeout=TIMEOUT, n_parallel=n_parallel),
         runner=tvm.autotvm.LocalRunner(
             number=MEASURE_NUMBER, repeat=MEASURE_REPEAT, timeout=TIMEOUT, min_repeat_ms=0
         ),
     )
 
+    logging.info(f"Using autotvm to tune {task.name}")
+    tuner_obj = tvm.autotvm.tuner.XGBTuner(task, loss_type="rank")
+    seed_log_filenames = [f for f in seed_log_filenames if os.path.exists(f)]
+    if seed_log_filenames:
+        tuner_obj.load_history(
+            itertools.chain.from_iterable(
+                tvm.autotvm.record.load_from_file(f) for f in seed_log_filenames
+            )
+        )
+
+    # do tuning
+    n_trial = min(AUTOTVM_NUM_TRIALS, len(task.config_space))
+    tuner_obj.tune(
+        n_trial=n_trial,
+        early_stopping=AUTOTVM_EARLY_STOPPING,
+        measure_option=measure_option,
+        callbacks=[
+            tvm.autotvm.callback.progress_bar(n_trial, prefix=prefix),
+            tvm.autotvm.callback.log_to_file(task_log_filename),
+        ],
+    )
+
+
+def tune_autotvm_tasks(tasks, log_filename):
+    """Appends to log_filename the best strategies for tasks"""
+    if len(tasks) == 0:
+        return
+
+    max_workers = max(1, min(AUTOTVM_CONCURRENT_TASKS, len(tasks)))
+    n_parallel = max(1, os.cpu_count() // max_workers)
     logging.info(
-        f"Using autotvm tuning for {len(tasks)} tasks with {AUTOTVM_NUM_TRIALS} trials, logging to {log_filename}"
+        f"Using autotvm tuning for {len(tasks)} tasks with {AUTOTVM_NUM_TRIALS} trials and {max_workers} workers, logging to {log_filename}"
     )
 
-    # create tmp log file, starting with contents from existing log file
+    # create tmp log file, starting with contents from existing log file. The tmp log is only ever
+    # read while tuning, so a hardlink will do and saves copying a possibly very large log.
     tmp_log_filename = log_filename + ".tmp"
     if os.path.exists(tmp_log_filename):
         os.remove(tmp_log_filename)
+    # also remove the per-task logs left behind by an interrupted run
+    for task_log_filename in glob.glob(glob.escape(tmp_log_filename) + ".*"):
+        os.remove(task_log_filename)
     if os.path.exists(log_filename):
-        logging.info(f"Copying existing log {log_filename} to {tmp_log_filename}")
-        shutil.copy(log_filename, tmp_log_filename)
-
-    for i, task in enumerate(reversed(tasks)):
-        prefix = "[Task %2d/%2d] " % (i + 1, len(tasks))
-        logging.info(f"Considering task {task.name} {prefix}")
-        if is_already_tuned(task, tmp_log_filename):
-            logging.info(f"Re-using existing record for {task.name}")
-            continue
-
-        logging.info(f"Using autotvm to tune {task.name}")
-        tuner_obj = tvm.autotvm.tuner.XGBTuner(task, loss_type="rank")
-        if os.path.exists(tmp_log_filename):
-            tuner_obj.load_history(tvm.autotvm.record.load_from_file(tmp_log_filename))
-
-        # do tuning
-        n_trial = min(AUTOTVM_NUM_TRIALS, len(task.config_space))
-        tuner_obj.tune(
-            n_trial=n_trial,
-            early_stopping=AUTOTVM_EARLY_STOPPING,
-            measure_option=measure_option,
-            callbacks=[
-                tvm.autotvm.callback.progress_bar(n_trial, prefix=prefix),
-                tvm.autotvm.callback.log_to_file(tmp_log_filename),
-            ],
-        )
-
-    # pick best records and copy back to main log file
-    tvm.autotvm.record.pick_best(tmp_log_filename, log_filename)
-    os.remove(tmp_log_filename)
+        try:
+            logging.info(f"Linking existing log {log_filename} to {tmp_log_filename}")
+            os.link(log_filename, tmp_log_filename)
+        except OSError:
+            logging.info(f"Copying existing log {log_filename} to {tmp_log_filename}")
+            shutil.copy(log_filename, tmp_log_filename)
+
+    task_log_filenames = []
+    if max_workers == 1:
+        # Tune in-process, warm-starting each task from the trials of the tasks tuned before it.
+        for i, task in enumerate(reversed(tasks)):
+            prefix = "[Task %2d/%2d] " % (i + 1, len(tasks))
+            logging.info(f"Considering task {task.name} {prefix}")
+            seed_log_filenames = [tmp_log_filename] + task_log_filenames
+            if any(is_already_tuned(task, f) for f in seed_log_filenames):
+                logging.info(f"Re-using existing record for {task.name}")
+                continue
+
+            task_log_filename = f"{tmp_log_filename}.{i}"
+            _tune_one(task, prefix, seed_log_filenames, task_log_filename, n_parallel)
+            task_log_filenames.append(task_log_filename)
+    else:
+        # Tasks are independent, so they may be tuned concurrently, each logging to its own file.
+        # Workers are spawned rather than forked so none of them inherits TVM or CUDA state from
+        # this process.
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            futures = []
+            for i, task in enumerate(reversed(tasks)):
+                prefix = "[Task %2d/%2d] " % (i + 1, len(tasks))
+                logging.info(f"Considering task {task.name} {prefix}")
+                if is_already_tuned(task, tmp_log_filename):
+                    logging.info(f"Re-using existing record for {task.name}")
+                    continue
+
+                task_log_filename = f"{tmp_log_filename}.{i}"
+                task_log_filenames.append(task_log_filename)
+                futures.append(
+                    executor.submit(
+                        _tune_one, task, prefix, [tmp_log_filename], task_log_filename, n_parallel
+                    )
+                )
+            for future in futures:
+                future.result()
+
+    # merge the per-task logs into a fresh file, since the tmp log may share its inode with the main
+    # log file, then pick best records from both and copy back to main log file
+    new_log_filename = log_filename + ".new"
+    with open(new_log_filename, "w") as fo:
+        for task_log_filename in task_log_filenames:
+            if os.path.exists(task_log_filename):
+                with open(task_log_filename) as fi:
+                    shutil.copyfileobj(fi, fo)
+                os.remove(task_log_filename)
+    tvm.autotvm.record.pick_best(new_log_filename, log_filename)
+    os.remove(new_log_filename)
+    if os.path.exists(tmp_log_filename):
+        os.remove(tmp_log_filename)
 
     logging.info("Done with autotvm tuning")
 
 
+# (structural hash of module, target) pairs already tuned by autotvm_tune_module in this process.
+_TUNED = set()
+
+
 def autotvm_tune_module(mod, target, log_filename):
     if log_filename == "":
         logging.info("Not tuning with autotvm since disabled")
         return
+    key = (tvm.ir.structural_hash(mod), str(target))
+    if key in _TUNED:
+        logging.info("Not tuning with autotvm since module already tuned for this target")
+        return
     # Extract and tune any TVM kernels. BYOC partitions will have no tasks extracted.
     logging.info("Extracting tasks from overall module")
     tasks = extract_autotvm_tasks(mod, target)
     logging.info(f"Auto-tuning {len(tasks)} tasks from overall module")
     tune_autotvm_tasks(tasks, log_filename)
+    _TUNED.add(key)
 
 
 ########### Drivers ###########
@@ -229,18 +284,44 @@ def compile_and_benchmark(label, model, targets, dev, tmp_dir):
         fo.write(code)
     logging.info(f"Exporting library to {lib_path}...")
     lib.export_library(lib_path, workspace_dir=tmp_dir, cc="nvcc")
-    runner = f"{runner_template}    run('{label}', '{model['name']}', tvm.device({dev.device_type}), '{lib_path}', '{code_path}', {model['input_shapes']}, {model['input_dtypes']})\n"
-    runner_path = os.path.join(tmp_dir, "runner.py")
-    logging.info(f"Saving runner to {runner_path}...")
-    with open(runner_path, "w") as fo:
-        fo.write(runner)
 
-    logging.info(f"Invoking runner...")
     if PROFILE:
+        # Only the profiler needs the model in its own process, everything else runs in-process
+        # so the TVM import and CUDA context are paid once.
+        params_path = os.path.join(tmp_dir, "params.pkl")
+        logging.info(f"Saving runner parameters to {params_path}...")
+        write_params(
+            params_path,
+            label,
+            model["name"],
+            dev,
+            lib_path,
+            code_path,
+            model["input_shapes"],
+            model["input_dtypes"],
+        )
         profile_path = os.path.join(tmp_dir, "profile.txt")
-        os.system(f"nsys nvprof -o {profile_path} python3 {runner_path}")
+        logging.info(f"Invoking runner under nsys, profiling to {profile_path}...")
+        runner_dir = os.path.dirname(os.path.abspath(__file__))
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [runner_dir, env.get("PYTHONPATH")]))
+        subprocess.run(
+            ["nsys", "nvprof", "-o", profile_path]
+            + ["python3", "-m", "tvm_collage_runner", params_path],
+            env=env,
+            check=False,
+        )
     else:
-        os.system(f"python3 {runner_path}")
+        logging.info("Running in-process...")
+        run(
+            label,
+            model["name"],
+            dev,
+            lib_path,
+            code_path,
+            model["input_shapes"],
+            model["input_dtypes"],
+        )
 
 
 def collage(model):
@@ -0,0 +1,102 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+"""Benchmarks a model compiled by demo_collage_partitioner.py.
+
+Usable in-process via run(), or as 'python3 -m tvm_collage_runner <params.pkl>' so that
+profiling tools can be wrapped around the model.
+"""
+
+import logging
+import pickle
+import sys
+
+import numpy as np
+import tvm
+import tvm.relay
+import tvm.runtime.vm
+
+logging.basicConfig(level=logging.INFO)
+
+MEASURE_NUMBER = tvm.relay.collage.MEASURE_NUMBER
+MEASURE_REPEAT = tvm.relay.collage.MEASURE_REPEAT
+WARMUP_MIN_REPEAT_MS = tvm.relay.collage.WARMUP_MIN_REPEAT_MS
+
+
+def arg_for(shape, dtype, device):
+    return tvm.nd.array(np.random.rand(*shape).astype(dtype), device=device)
+
+
+def vm_estimate_seconds(device, vm, args):
+    vm.benchmark(device, repeat=1, number=1, min_repeat_ms=WARMUP_MIN_REPEAT_MS, **args)
+    return vm.benchmark(
+        device, repeat=MEASURE_REPEAT, number=MEASURE_NUMBER, min_repeat_ms=0, **args
+    )
+
+
+def load_executable(lib_path, code_path):
+    """Returns the VM executable saved to lib_path and code_path."""
+    loaded_lib = tvm.runtime.load_module(lib_path)
+    loaded_code = bytearray(open(code_path, "rb").read())
+    return tvm.runtime.vm.Executable.load_exec(loaded_code, loaded_lib)
+
+
+def run(label, name, device, lib_path, code_path, input_shapes, input_dtypes):
+    """Benchmarks the compiled model in lib_path and code_path on device."""
+    logging.info(
+        f"Loading compiled code for {name} generated by {label} from {lib_path} and {code_path}..."
+    )
+    vm = tvm.runtime.vm.VirtualMachine(load_executable(lib_path, code_path), device)
+    args = {
+        input_name: arg_for(input_shapes[input_name], input_dtypes[input_name], device)
+        for input_name in input_shapes.keys()
+    }
+    logging.info(f"Benchmarking for {name} generated by {label}...")
+    profile = vm_estimate_seconds(device, vm, args)
+    logging.info(f"Benchmarked for {name} generated by {label}: {profile}")
+    logging.info(f"RESULT: {label} | {name} | {profile.median * 1e3}ms")
+
+
+def write_params(
+    params_path, label, name, device, lib_path, code_path, input_shapes, input_dtypes
+):
+    """Saves the arguments of run() to params_path for invoking this module as a script."""
+    params = {
+        "label": label,
+        "name": name,
+        "device_type": device.device_type,
+        "lib_path": lib_path,
+        "code_path": code_path,
+        "input_shapes": input_shapes,
+        "input_dtypes": input_dtypes,
+    }
+    with open(params_path, "wb") as fo:
+        pickle.dump(params, fo)
+
+
+if __name__ == "__main__":
+    with open(sys.argv[1], "rb") as fi:
+        params = pickle.load(fi)
+    run(
+        params["label"],
+        params["name"],
+        tvm.device(params["device_type"]),
+        params["lib_path"],
+        params["code_path"],
+        params["input_shapes"],
+        params["input_dtypes"],
+    )
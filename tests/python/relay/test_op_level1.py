@@ -760,6 +760,46 @@ def test_bitserial_dense():
     assert yy.checked_type == relay.TensorType((m, 32), "int16")
 
 
+@tvm.testing.parametrize_targets
+def test_multi_threshold(target, dev):
+    def verify(data_shape, out_dtype, dtype="float32"):
+        signed = "UINT" not in out_dtype
+        bit_width = int(out_dtype[3 if signed else 4 :])
+        num_thresholds = 2**bit_width - 1
+        out_bias = -(2**bit_width) // 2 if signed else 0
+        container = ("int" if signed else "uint") + str(max(8, 1 << (bit_width - 1).bit_length()))
+        channels = data_shape[1]
+
+        x = relay.var("x", relay.TensorType(data_shape, dtype))
+        t = relay.var("t", relay.TensorType((channels, num_thresholds), dtype))
+        y = relay.nn.multi_threshold(x, t, out_dtype, out_bias)
+        yy = run_infer_type(y)
+        assert yy.checked_type == relay.TensorType(data_shape, container)
+
+        if dtype == "int8":
+            x_data = np.random.randint(-128, 128, size=data_shape).astype(dtype)
+            t_data = np.random.randint(-128, 128, size=(channels, num_thresholds))
+        else:
+            x_data = np.random.uniform(-1, 1, size=data_shape).astype(dtype)
+            t_data = np.random.uniform(-1, 1, size=(channels, num_thresholds))
+        t_data = np.sort(t_data.astype(dtype), axis=-1)
+        ref_res = tvm.topi.testing.multi_threshold_python(x_data, t_data, out_bias, container)
+
+        func = relay.Function([x, t], y)
+        op_res = relay.create_executor("graph", device=dev, target=target).evaluate(func)(
+            x_data, t_data
+        )
+        assert op_res.dtype == container
+        np.testing.assert_equal(op_res.numpy(), ref_res)
+
+    verify((1, 16), "UINT2")
+    verify((2, 8, 7, 5), "UINT4")
+    verify((1, 4, 6, 6), "INT4")
+    verify((1, 4, 6, 6), "UINT8")
+    verify((1, 4, 6, 6), "INT8")
+    verify((1, 4, 8, 64), "UINT4", dtype="int8")
+
+
 @tvm.testing.requires_cascadelake
 @pytest.mark.parametrize("m,n,k", [(32, 128, 96), (32, 128, 97)])
 def test_dense_vnni(m, n, k):
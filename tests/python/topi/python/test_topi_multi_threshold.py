@@ -0,0 +1,187 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""Test code for the FINN multi_threshold operator"""
+import platform
+import sys
+
+import numpy as np
+import pytest
+import tvm
+import tvm.testing
+import tvm.topi.testing
+from tvm import te, topi
+
+
+_multi_threshold_implement = {
+    "generic": (topi.nn.multi_threshold, topi.generic.schedule_injective),
+    "cpu": (topi.nn.multi_threshold, topi.x86.schedule_injective),
+    "gpu": (topi.nn.multi_threshold, topi.cuda.schedule_multi_threshold),
+}
+
+
+def _has_avx2():
+    # Only linux is supported for now.
+    if platform.machine() == "x86_64" and sys.platform.startswith("linux"):
+        with open("/proc/cpuinfo", "r") as content:
+            return "avx2" in content.read()
+
+    return False
+
+
+def verify_multi_threshold(
+    target, dev, data_shape, bit_width, signed, dtype, fcompute, fschedule, num_thresholds=None
+):
+    if num_thresholds is None:
+        num_thresholds = 2**bit_width - 1
+    out_bias = -(2**bit_width) // 2 if signed else 0
+    out_dtype = "int8" if signed else "uint8"
+    channels = data_shape[1]
+    data = te.placeholder(data_shape, dtype=dtype, name="data")
+    thresholds = te.placeholder((channels, num_thresholds), dtype=dtype, name="thresholds")
+
+    with tvm.target.Target(target):
+        out = fcompute(data, thresholds, bit_width, signed, out_bias, out_dtype)
+        s = fschedule([out])
+
+    func = tvm.build(s, [data, thresholds, out], target=target)
+
+    if dtype == "int8":
+        data_np = np.random.randint(-128, 128, size=data_shape).astype(dtype)
+        thresholds_np = np.random.randint(-128, 128, size=(channels, num_thresholds))
+    else:
+        data_np = np.random.uniform(-1, 1, size=data_shape).astype(dtype)
+        thresholds_np = np.random.uniform(-1, 1, size=(channels, num_thresholds))
+    thresholds_np = np.sort(thresholds_np.astype(dtype), axis=-1)
+    ref = tvm.topi.testing.multi_threshold_python(data_np, thresholds_np, out_bias, out_dtype)
+
+    a = tvm.nd.array(data_np, dev)
+    b = tvm.nd.array(thresholds_np, dev)
+    c = tvm.nd.array(np.zeros(data_shape, dtype=out_dtype), dev)
+    func(a, b, c)
+    np.testing.assert_equal(c.numpy(), ref)
+
+
+@tvm.testing.parametrize_targets
+def test_multi_threshold(dev, target):
+    fcompute, fschedule = tvm.topi.testing.dispatch(target, _multi_threshold_implement)
+
+    def verify(data_shape, bit_width, signed=False, dtype="float32", num_thresholds=None):
+        verify_multi_threshold(
+            target,
+            dev,
+            data_shape,
+            bit_width,
+            signed,
+            dtype,
+            fcompute,
+            fschedule,
+            num_thresholds,
+        )
+
+    verify((1, 16), 2)
+    verify((4, 16), 4)
+    verify((1, 3, 8, 8), 2)
+    verify((2, 8, 7, 5), 4)
+    verify((1, 4, 6, 6), 6)
+    verify((1, 4, 6, 6), 7)
+    verify((1, 4, 6, 6), 8)
+    verify((2, 8, 7, 5), 4, signed=True)
+    verify((1, 4, 6, 6), 8, signed=True)
+    # the largest table counted with a single popcount, and the smallest binary searched one
+    verify((1, 4, 6, 6), 7, num_thresholds=64)
+    verify((1, 4, 6, 6), 7, num_thresholds=65, signed=True)
+    # table sizes other than 2**k - 1, where the binary search strides overshoot the table
+    verify((1, 4, 6, 6), 7, num_thresholds=65)
+    verify((1, 4, 6, 6), 7, num_thresholds=100)
+    verify((2, 3, 5, 7), 8, num_thresholds=200)
+    verify((1, 4, 6, 6), 8, signed=True, num_thresholds=200)
+
+
+@tvm.testing.parametrize_targets("cuda")
+def test_multi_threshold_cast_cuda(target, dev):
+    data_shape = (1, 4, 6, 6)
+    data = te.placeholder(data_shape, dtype="float32", name="data")
+    thresholds = te.placeholder((4, 15), dtype="float32", name="thresholds")
+    with tvm.target.Target(target):
+        # the cast the ONNX frontend adds after every MultiThreshold is fused with it
+        out = topi.cast(topi.nn.multi_threshold(data, thresholds, 4, False, 0, "uint8"), "float32")
+        s = topi.cuda.schedule_multi_threshold([out])
+        assert "shared" in str(tvm.lower(s, [data, thresholds, out]))
+        func = tvm.build(s, [data, thresholds, out], target=target)
+
+    data_np = np.random.uniform(-1, 1, size=data_shape).astype("float32")
+    thresholds_np = np.sort(np.random.uniform(-1, 1, size=(4, 15)).astype("float32"), axis=-1)
+    ref = tvm.topi.testing.multi_threshold_python(data_np, thresholds_np, 0, "float32")
+
+    a = tvm.nd.array(data_np, dev)
+    b = tvm.nd.array(thresholds_np, dev)
+    c = tvm.nd.array(np.zeros(data_shape, dtype="float32"), dev)
+    func(a, b, c)
+    np.testing.assert_equal(c.numpy(), ref)
+
+
+@tvm.testing.requires_x86
+@tvm.testing.requires_llvm
+@pytest.mark.skipif(not _has_avx2(), reason="Requires a host with AVX2")
+def test_multi_threshold_int8_x86():
+    target = "llvm -mcpu=core-avx2"
+    dev = tvm.cpu(0)
+
+    def verify(data_shape, bit_width, signed=False):
+        verify_multi_threshold(
+            target,
+            dev,
+            data_shape,
+            bit_width,
+            signed,
+            "int8",
+            topi.x86.multi_threshold_int8,
+            topi.x86.schedule_multi_threshold_int8,
+        )
+
+    verify((1, 64), 4)
+    verify((2, 8, 7, 40), 4)
+    verify((1, 4, 8, 64), 8)
+    verify((1, 4, 8, 64), 8, signed=True)
+    # FINN feature maps, whose spatial extents are not a multiple of the vector width
+    verify((1, 4, 7, 7), 4)
+    verify((2, 3, 14, 14), 4)
+    verify((1, 2, 28, 28), 8, signed=True)
+
+
+def test_multi_threshold_int8_x86_vectorized():
+    data = te.placeholder((1, 4, 7, 7), dtype="int8", name="data")
+    thresholds = te.placeholder((4, 15), dtype="int8", name="thresholds")
+    with tvm.target.Target("llvm -mcpu=core-avx2"):
+        out = topi.x86.multi_threshold_int8(data, thresholds, 4, False, 0, "uint8")
+        s = topi.x86.schedule_multi_threshold_int8([out])
+        mod = tvm.lower(s, [data, thresholds, out])
+
+    compares = []
+
+    def _visit(node):
+        if isinstance(node, tvm.tir.GE):
+            compares.append(node)
+
+    tvm.tir.stmt_functor.post_order_visit(mod["main"].body, _visit)
+    # the 7x7 spatial positions of a channel are compared at once, without a scalarized tail
+    assert compares
+    assert all(tvm.DataType(c.a.dtype).lanes == 49 for c in compares)
+
+
+if __name__ == "__main__":
+    tvm.testing.main()